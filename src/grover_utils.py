@@ -1,5 +1,45 @@
+import math
+
+import numpy as np
 from qiskit import QuantumCircuit
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; without it a vectorized NumPy kernel is used
+    njit = None
+
+try:
+    import cupy
+except ImportError:  # CuPy is optional; batches run on the CPU with NumPy instead
+    cupy = None
+
+# Qubits of the 4-qubit 2x2 Sudoku circuit, hoisted so the oracle does not rebuild the list
+_ALL = [0, 1, 2, 3]
+
+# Phase applied by the oracle to each of the 16 basis states. Qubit k is bit k
+# of the basis index (Qiskit little-endian order); a CZ on a pair of qubits
+# flips the phase whenever both bits are set.
+ORACLE_PHASES = np.array([
+    (-1.0) ** ((i & 1) * ((i >> 1) & 1) + ((i >> 2) & 1) * ((i >> 3) & 1))
+    for i in range(16)
+])
+
+def puzzle_to_mask(puzzle):
+    """Encodes the pre-filled cells of a puzzle as an integer bitmask.
+
+    Bit i of the mask is set when cell i is pre-filled, i.e. when qubit i of
+    the circuit starts in the |1⟩ state. This matches Qiskit's little-endian
+    ordering, so the mask is also the index of the initial basis state.
+
+    Args:
+        puzzle (list): A list representing the Sudoku puzzle, where 1 indicates 
+                       a pre-filled cell and 0 indicates an unknown cell.
+
+    Returns:
+        int: The bitmask of pre-filled cells.
+    """
+    return sum(1 << i for i, value in enumerate(puzzle) if value == 1)
+
 def construct_oracle():
     """Constructs a simple oracle for a 2x2 Sudoku puzzle.
     
@@ -8,10 +48,12 @@ def construct_oracle():
     - Qubit 0 and Qubit 1 must represent different values.
     - Qubit 2 and Qubit 3 must also represent different values.
     
-    The oracle is constructed using controlled-Z (CZ) gates, which will flip 
-    the phase of the state if both qubits involved are in the |1⟩ state. 
+    The oracle is equivalent to controlled-Z (CZ) gates on each pair, which 
+    flip the phase of the state if both qubits involved are in the |1⟩ state. 
     This enforces the condition that the values represented by these qubits 
-    cannot be the same.
+    cannot be the same. Since both CZ gates are diagonal, their product is 
+    applied as a single precomputed diagonal gate (see ``ORACLE_PHASES``), 
+    which the simulator executes in one pass over the state vector.
 
     Returns:
         QuantumCircuit: A quantum circuit representing the oracle.
@@ -19,9 +61,8 @@ def construct_oracle():
     # Create a quantum circuit with 4 qubits for the 2x2 Sudoku puzzle
     oracle = QuantumCircuit(4)
 
-    # Enforcing qubit pairs to be different values
-    oracle.cz(0, 1)  # Enforce that qubits 0 and 1 are different
-    oracle.cz(2, 3)  # Enforce that qubits 2 and 3 are different
+    # Enforce that qubits 0/1 and qubits 2/3 are different, i.e. CZ(0, 1) * CZ(2, 3)
+    oracle.diagonal(ORACLE_PHASES.tolist(), _ALL)
     
     return oracle
 
@@ -36,11 +77,12 @@ def diffusion_operator(num_qubits):
     The steps involved in creating the diffusion operator are:
     1. Apply Hadamard gates to all qubits, putting them into a superposition.
     2. Apply X gates to all qubits, which inverts the states.
-    3. Apply a Hadamard gate to the last qubit.
-    4. Use a multi-controlled NOT (MCX) gate to create the reflection.
-    5. Apply a Hadamard gate to the last qubit again.
-    6. Apply X gates again to all qubits.
-    7. Apply Hadamard gates to all qubits to complete the diffusion process.
+    3. Use a multi-controlled phase (MCP) gate with a phase of pi to create
+       the reflection. This is equivalent to a multi-controlled NOT on the
+       last qubit sandwiched between Hadamards, without the deep CX/T
+       decomposition that MCX requires.
+    4. Apply X gates again to all qubits.
+    5. Apply Hadamard gates to all qubits to complete the diffusion process.
 
     Args:
         num_qubits (int): The number of qubits in the circuit.
@@ -50,26 +92,177 @@ def diffusion_operator(num_qubits):
     """
     # Create a quantum circuit with the specified number of qubits
     diffusion = QuantumCircuit(num_qubits)
+    qubits = diffusion.qubits  # Broadcast every layer over the circuit's own qubit list
 
     # Step 1: Apply Hadamard gates to all qubits to create superposition
-    diffusion.h(range(num_qubits))
+    diffusion.h(qubits)
     
     # Step 2: Apply X gates to all qubits to invert their states
-    diffusion.x(range(num_qubits))
+    diffusion.x(qubits)
     
-    # Step 3: Apply Hadamard to the last qubit
-    diffusion.h(num_qubits - 1)
-
-    # Step 4: Apply multi-controlled NOT gate for reflection
-    diffusion.mcx(list(range(num_qubits - 1)), num_qubits - 1)
-
-    # Step 5: Apply Hadamard to the last qubit again
-    diffusion.h(num_qubits - 1)
+    # Step 3: Apply multi-controlled Z (phase of pi) for reflection
+    diffusion.mcp(math.pi, qubits[:-1], qubits[-1])
     
-    # Step 6: Apply X gates again to all qubits
-    diffusion.x(range(num_qubits))
+    # Step 4: Apply X gates again to all qubits
+    diffusion.x(qubits)
     
-    # Step 7: Apply Hadamard gates to all qubits again to complete diffusion
-    diffusion.h(range(num_qubits))
+    # Step 5: Apply Hadamard gates to all qubits again to complete diffusion
+    diffusion.h(qubits)
     
     return diffusion
+
+def grover_4q(puzzle):
+    """Simulates one Grover iteration for the 2x2 Sudoku directly in NumPy.
+
+    For 4 qubits the full state is only 16 real amplitudes, so building,
+    transpiling and dispatching a Qiskit circuit costs far more than the
+    arithmetic itself. This function applies the same steps as the circuit
+    built by ``solve_sudoku`` straight to the amplitude vector, using a kernel
+    that is JIT-compiled with Numba when available:
+
+    1. X gates on the pre-filled cells followed by Hadamards on all qubits
+       give amplitudes of 1/4 whose sign is the parity of ``i & mask``.
+    2. The oracle multiplies the amplitudes by ``ORACLE_PHASES``.
+    3. The diffusion operator reflects every amplitude about the mean.
+
+    Args:
+        puzzle (list): A list representing the Sudoku puzzle, where 1 indicates 
+                       a pre-filled cell and 0 indicates an unknown cell.
+
+    Returns:
+        dict: A dictionary containing the expected counts of each basis state
+              over 1024 shots, in the same format as ``solve_sudoku``.
+    """
+    probabilities = _grover_kernel(puzzle_to_mask(puzzle)).tolist()
+
+    shots = 1024
+    return {format(i, '04b'): p * shots
+            for i, p in enumerate(probabilities) if p > 1e-12}
+
+def _grover_loop_kernel(init_mask):
+    """Computes the final probabilities of the 4-qubit Grover iteration.
+
+    Written as explicit loops for Numba, which compiles the whole iteration 
+    into a single loop over the 16 amplitudes without temporary arrays. 
+    Amplitudes are stored in single precision, which is ample for a 4-qubit 
+    state. Run as plain Python this is slower than ``_grover_vector_kernel``.
+
+    Args:
+        init_mask (int): Bitmask of the qubits that receive an X gate.
+
+    Returns:
+        numpy.ndarray: The probability of each of the 16 basis states.
+    """
+    psi = np.empty(16, dtype=np.float32)
+    total = 0.0
+    for i in range(16):
+        # Step 1: H|mask> has amplitude (-1)^popcount(i & mask) / 4 on basis state i
+        bits = i & init_mask
+        parity = 0
+        while bits:
+            parity ^= bits & 1
+            bits >>= 1
+        # Step 2: Apply the oracle phase
+        psi[i] = (1 - 2 * parity) * 0.25 * ORACLE_PHASES[i]
+        total += psi[i]
+
+    # Step 3: Apply the diffusion operator, 2|s><s| - I, as a reflection about the mean
+    mean = total / 16
+    probabilities = np.empty(16, dtype=np.float32)
+    for i in range(16):
+        amplitude = 2 * mean - psi[i]
+        probabilities[i] = amplitude * amplitude
+    return probabilities
+
+# Sign of the initial amplitude of basis state i is the parity of popcount(i),
+# so the amplitudes for any mask are a lookup at i & mask
+_INDICES = np.arange(16)
+_INIT_AMPLITUDES = np.array([1 - 2 * (bin(i).count('1') & 1) for i in range(16)],
+                            dtype=np.float32) / 4
+_ORACLE_PHASES_32 = ORACLE_PHASES.astype(np.float32)
+
+def _grover_vector_kernel(init_mask):
+    """Computes the same probabilities as ``_grover_loop_kernel`` with NumPy.
+
+    Used when Numba is not installed, since whole-array operations on the 
+    precomputed tables avoid indexing the arrays one element at a time.
+
+    Args:
+        init_mask (int): Bitmask of the qubits that receive an X gate.
+
+    Returns:
+        numpy.ndarray: The probability of each of the 16 basis states.
+    """
+    # Steps 1 and 2: Look up the initial amplitudes and apply the oracle phases
+    psi = _INIT_AMPLITUDES[_INDICES & init_mask] * _ORACLE_PHASES_32
+
+    # Step 3: Apply the diffusion operator as a reflection about the mean
+    psi = 2 * psi.mean() - psi
+    return psi * psi
+
+if njit is not None:
+    _grover_kernel = njit(cache=True, fastmath=True)(_grover_loop_kernel)
+else:
+    _grover_kernel = _grover_vector_kernel
+
+# Smallest batch for which grover_4q_batch moves the work to the GPU by default
+GPU_BATCH_THRESHOLD = 10_000
+
+def grover_4q_batch(puzzles, use_gpu=None):
+    """Simulates the 4-qubit Grover iteration for a batch of puzzles at once.
+
+    The state vectors of all puzzles are stored as a single ``(B, 16)`` array
+    and every step of the iteration is applied to the whole batch with
+    broadcasted array operations. The GPU only pays off for large batches, so
+    by default CuPy is used when it is installed and the batch has at least
+    ``GPU_BATCH_THRESHOLD`` puzzles; otherwise NumPy is used. If no CUDA
+    device is usable the batch falls back to NumPy. Amplitudes are stored in
+    single precision to halve the memory traffic of each step.
+
+    Args:
+        puzzles (list): A list of puzzles, each in the format accepted by
+                        ``grover_4q``.
+        use_gpu (bool): Whether to run on the GPU with CuPy. Defaults to None,
+                        which picks the GPU based on the batch size.
+
+    Returns:
+        numpy.ndarray: A ``(B, 16)`` array with the probability of each basis
+                       state for each puzzle.
+    """
+    masks = [puzzle_to_mask(puzzle) for puzzle in puzzles]
+    if use_gpu is None:
+        use_gpu = len(masks) >= GPU_BATCH_THRESHOLD
+
+    if use_gpu and cupy is not None:
+        try:
+            return cupy.asnumpy(_grover_batch_kernel(masks, cupy))
+        except cupy.cuda.runtime.CUDARuntimeError:
+            pass  # No usable CUDA device; run the batch with NumPy instead
+    return _grover_batch_kernel(masks, np)
+
+def _grover_batch_kernel(masks, xp):
+    """Applies the Grover iteration to a batch of initialization masks.
+
+    Args:
+        masks (list): Bitmask of the qubits that receive an X gate, per puzzle.
+        xp (module): The array module to compute with, NumPy or CuPy.
+
+    Returns:
+        array: A ``(B, 16)`` array of probabilities on the device of ``xp``.
+    """
+    masks = xp.asarray(masks, dtype=xp.int64)
+
+    # Step 1: H|mask> has amplitude (-1)^popcount(i & mask) / 4 on basis state i.
+    # Folding the 4 bits onto bit 0 with XORs gives the parity without a loop.
+    bits = masks[:, None] & xp.arange(16)
+    bits ^= bits >> 2
+    bits ^= bits >> 1
+    psi = (1 - 2 * (bits & 1)).astype(xp.float32) / 4
+
+    # Step 2: Apply the oracle phases to every state vector in the batch
+    psi = psi * xp.asarray(ORACLE_PHASES, dtype=xp.float32)
+
+    # Step 3: Apply the diffusion operator as a reflection about each row's mean
+    psi = 2 * psi.mean(axis=1, keepdims=True) - psi
+
+    return psi ** 2
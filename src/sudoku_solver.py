@@ -1,14 +1,27 @@
-from qiskit import Aer, QuantumCircuit, QuantumRegister, ClassicalRegister, execute
-from qiskit.visualization import plot_histogram
-from grover_utils import construct_oracle, diffusion_operator
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from qiskit import QuantumCircuit, QuantumRegister, transpile
+from qiskit_aer import AerSimulator
+from grover_utils import construct_oracle, diffusion_operator, puzzle_to_mask
+
+# Shared state vector simulator, created once at import and reused by every call.
+# Single precision halves the memory traffic per gate and is ample for 4 qubits.
+# Aer only fuses gates on circuits above fusion_threshold qubits (14 by default),
+# so the threshold is lowered to let the 4-qubit circuit fuse into few dense ops.
+_SIM = AerSimulator(method='statevector',
+                    precision='single',
+                    fusion_enable=True,
+                    fusion_threshold=2,
+                    fusion_max_qubit=4)
 
 def initialize_sudoku_state(puzzle):
     """Initialize the puzzle with known values.
     
     This function sets up the initial state of the quantum circuit based on
     the provided Sudoku puzzle. The known values are represented as qubits 
-    in the quantum circuit.
+    in the quantum circuit. The puzzle is encoded as a bitmask and a single 
+    broadcast X gate call flips every pre-filled cell.
 
     Args:
         puzzle (list): A list representing the Sudoku puzzle, where 1 indicates 
@@ -21,62 +34,143 @@ def initialize_sudoku_state(puzzle):
     qr = QuantumRegister(4)
     circuit = QuantumCircuit(qr)
 
-    # Initialize known values in the Sudoku grid
-    for i, value in enumerate(puzzle):
-        if value == 1:
-            circuit.x(qr[i])  # Apply X gate to represent '1' in that cell
+    # Initialize known values in the Sudoku grid, applying X to each set bit of the mask
+    mask = puzzle_to_mask(puzzle)
+    if mask:  # Qiskit rejects an empty qubit list, e.g. for an empty puzzle
+        circuit.x([i for i in range(len(qr)) if mask >> i & 1])
     return circuit
 
-def solve_sudoku(puzzle):
+@lru_cache(maxsize=None)
+def _grover_body(num_qubits):
+    """Builds and transpiles the puzzle-independent Grover iteration.
+
+    The oracle and diffusion operator are identical for every puzzle of a
+    given size; only the initialization layer changes. The transpiled body is
+    therefore cached per number of qubits so warm calls skip transpilation.
+
+    Args:
+        num_qubits (int): The number of qubits in the circuit.
+
+    Returns:
+        QuantumCircuit: The transpiled oracle followed by the diffusion operator.
+    """
+    body = QuantumCircuit(num_qubits)
+    body.compose(construct_oracle(), inplace=True)  # Oracle enforcing Sudoku constraints
+    body.compose(diffusion_operator(num_qubits), inplace=True)  # Amplitude amplification
+    return transpile(body, _SIM, optimization_level=3)
+
+@lru_cache(maxsize=256)
+def _solve_cached(puzzle):
+    """Simulates the Grover circuit for a puzzle and caches the resulting counts.
+
+    The counts depend only on the puzzle, so repeated or duplicate puzzles 
+    are answered from the cache instead of being simulated again. The 
+    cached dictionary is never handed out directly; see ``solve_sudoku``.
+
+    Args:
+        puzzle (tuple): The puzzle as a tuple, so it can be used as a cache key.
+
+    Returns:
+        dict: The expected counts of each basis state over 1024 shots.
+    """
+    # Start from the initialization circuit itself instead of composing it into
+    # an empty circuit. No classical register is needed since nothing is measured.
+    circuit = initialize_sudoku_state(puzzle)  # Get the initialization circuit
+    qr = circuit.qregs[0]  # Quantum register with 4 qubits
+
+    # Step 1: Apply Hadamard gates to create superposition of all states
+    circuit.h(qr)
+
+    # Step 2: Apply the cached, pre-transpiled Grover operator (oracle + diffusion)
+    circuit.compose(_grover_body(len(qr)), inplace=True)
+
+    # Step 3: Save the final probabilities instead of measuring
+    circuit.save_probabilities_dict()  # Exact distribution over the basis states
+
+    # Step 4: Execute the circuit on the shared state vector simulator. The Grover
+    # body is already transpiled and the remaining instructions are native to Aer,
+    # so the circuit is run directly without another transpile pass. A single
+    # shot suffices since the probabilities are saved exactly, not sampled.
+    result = _SIM.run(circuit, shots=1).result()  # Execute and get results
+    probabilities = result.data()['probabilities']  # Keyed by integer basis state, e.g. 3
+
+    # Scale the exact probabilities to expected counts rather than sampling shots
+    shots = 1024
+    counts = {format(state, '04b'): p * shots
+              for state, p in probabilities.items() if p > 1e-12}
+
+    return counts
+
+def solve_sudoku(puzzle, plot=False):
     """Solves the 2x2 Sudoku puzzle using Grover's algorithm.
     
     This function constructs a quantum circuit to solve the provided Sudoku 
     puzzle using Grover's search algorithm. The circuit includes an oracle 
     that encodes the Sudoku constraints and a diffusion operator to amplify 
-    the correct solutions.
+    the correct solutions. Results are cached per puzzle, so solving the same 
+    puzzle again does not re-run the simulation.
 
     Args:
         puzzle (list): A list representing the Sudoku puzzle, where 1 indicates 
                        a pre-filled cell and 0 indicates an unknown cell.
+        plot (bool): Whether to display a histogram of the counts. Defaults to
+                     False so programmatic callers never import Matplotlib or
+                     block on the plot window.
 
     Returns:
-        dict: A dictionary containing the counts of measured states after execution.
+        dict: A dictionary containing the expected counts of each basis state
+              over 1024 shots, derived exactly from the final probabilities.
     """
-    # Create quantum and classical registers
-    qr = QuantumRegister(4)  # Quantum register with 4 qubits
-    cr = ClassicalRegister(4)  # Classical register for measurement
-    circuit = QuantumCircuit(qr, cr)  # Create the quantum circuit
+    # Copy the cached counts so callers cannot modify the cache entry
+    counts = dict(_solve_cached(tuple(puzzle)))
 
-    # Initialize the puzzle
-    init_circuit = initialize_sudoku_state(puzzle)  # Get the initialization circuit
-    circuit.compose(init_circuit, inplace=True)  # Compose it into the main circuit
+    # Optionally plot the results using a histogram
+    if plot:
+        # Imported lazily since Qiskit's visualization module and Matplotlib
+        # take far longer to import than the simulation itself
+        from qiskit.visualization import plot_histogram
+        import matplotlib.pyplot as plt
+        plot_histogram(counts)  # Plot the measurement results
+        plt.show()  # Display the plot
 
-    # Step 1: Apply Hadamard gates to create superposition of all states
-    circuit.h(qr)
+    return counts  # Return the counts of solutions
 
-    # Step 2: Construct and apply the Grover operator (oracle + diffusion)
-    oracle = construct_oracle()  # Get the oracle that enforces Sudoku constraints
-    circuit.compose(oracle, inplace=True)  # Compose the oracle into the circuit
-    diffusion = diffusion_operator(len(qr))  # Create the diffusion operator
-    circuit.compose(diffusion, inplace=True)  # Compose the diffusion operator into the circuit
+def solve_sudoku_batch(puzzles, max_workers=None, chunksize=1):
+    """Solves a batch of 2x2 Sudoku puzzles in parallel worker processes.
 
-    # Step 3: Measurement of the quantum states
-    circuit.measure(qr, cr)  # Measure the quantum register into the classical register
+    Each puzzle is solved independently with ``solve_sudoku``, so the batch 
+    is distributed across a process pool. Duplicate puzzles are solved only 
+    once, since the per-process result cache is not shared between workers. 
+    Every worker keeps its own simulator and cached Grover body, which are 
+    reused for all the puzzles it handles. Plotting is disabled in the workers.
 
-    # Step 4: Execute the circuit on a quantum simulator
-    backend = Aer.get_backend('qasm_simulator')  # Use the QASM simulator backend
-    result = execute(circuit, backend, shots=1024).result()  # Execute and get results
-    counts = result.get_counts()  # Get the counts of measurement results
+    Args:
+        puzzles (iterable): The puzzles, each in the format accepted by 
+                            ``solve_sudoku``.
+        max_workers (int): The number of worker processes. Defaults to the 
+                           number of CPUs.
+        chunksize (int): The number of puzzles sent to a worker at a time. 
+                         Larger values reduce inter-process overhead for 
+                         big batches.
 
-    # Step 5: Plot the results using a histogram
-    plot_histogram(counts)  # Plot the measurement results
-    plt.show()  # Display the plot
+    Returns:
+        list: The counts dictionary for each puzzle, in the same order.
+    """
+    # Read the puzzles once so any iterable works, then solve each distinct
+    # puzzle once, keeping the order in which they first appear
+    puzzles = [tuple(puzzle) for puzzle in puzzles]
+    unique_puzzles = list(dict.fromkeys(puzzles))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        solutions = dict(zip(unique_puzzles,
+                             executor.map(solve_sudoku, unique_puzzles, chunksize=chunksize)))
 
-    return counts  # Return the counts of solutions
+    # Give every puzzle its own copy so duplicates do not share a dictionary
+    return [dict(solutions[puzzle]) for puzzle in puzzles]
 
-# Example 2x2 puzzle (0 = unknown, 1 = pre-filled cell with value)
-# Example puzzle layout:
-# [1, 0, 0, 0]  # Represents a 2x2 puzzle with the first cell filled as '1'
-example_puzzle = [1, 0, 0, 0]
-solution = solve_sudoku(example_puzzle)  # Solve the Sudoku puzzle
-print("Solution counts:", solution)  # Print the solution counts
+if __name__ == '__main__':
+    # Example 2x2 puzzle (0 = unknown, 1 = pre-filled cell with value)
+    # Example puzzle layout:
+    # [1, 0, 0, 0]  # Represents a 2x2 puzzle with the first cell filled as '1'
+    example_puzzle = [1, 0, 0, 0]
+    solution = solve_sudoku(example_puzzle, plot=True)  # Solve the Sudoku puzzle
+    print("Solution counts:", solution)  # Print the solution counts
@@ -0,0 +1,48 @@
+"""Checks that the Qiskit solver and the NumPy kernels agree on every puzzle."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
+
+from grover_utils import grover_4q, grover_4q_batch  # noqa: E402
+from sudoku_solver import solve_sudoku  # noqa: E402
+
+# Every 2x2 puzzle, i.e. all 16 initialization masks
+PUZZLES = [[(mask >> i) & 1 for i in range(4)] for mask in range(16)]
+STATES = [format(i, '04b') for i in range(16)]
+SHOTS = 1024
+
+
+def _as_vector(counts):
+    return [counts.get(state, 0.0) for state in STATES]
+
+
+def test_grover_4q_returns_python_floats():
+    counts = grover_4q([1, 0, 0, 0])
+    assert all(type(value) is float for value in counts.values())
+
+
+def test_grover_4q_matches_batch():
+    batch = grover_4q_batch(PUZZLES, use_gpu=False) * SHOTS
+    for puzzle, row in zip(PUZZLES, batch):
+        assert _as_vector(grover_4q(puzzle)) == pytest.approx(row.tolist(), abs=1e-2)
+
+
+def test_grover_4q_batch_empty():
+    assert grover_4q_batch([]).shape == (0, 16)
+
+
+def test_grover_4q_matches_solve_sudoku():
+    for puzzle in PUZZLES:
+        assert _as_vector(solve_sudoku(puzzle)) == pytest.approx(
+            _as_vector(grover_4q(puzzle)), abs=1e-2)
+
+
+def test_grover_kernels_agree():
+    from grover_utils import _grover_loop_kernel, _grover_vector_kernel
+
+    for mask in range(16):
+        assert _grover_vector_kernel(mask).tolist() == pytest.approx(
+            _grover_loop_kernel(mask).tolist(), abs=1e-6)
@@ -0,0 +1,40 @@
+"""Tests for the batch and caching behaviour of the Qiskit solver."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
+
+from sudoku_solver import solve_sudoku, solve_sudoku_batch  # noqa: E402
+
+
+def test_solve_sudoku_batch_keeps_order_and_duplicates():
+    puzzles = [[1, 0, 0, 0], [0, 0, 1, 1], [1, 0, 0, 0]]
+    results = solve_sudoku_batch(iter(puzzles), max_workers=1)
+
+    assert results == [solve_sudoku(puzzle) for puzzle in puzzles]
+    assert results[0] is not results[2]
+
+
+def test_solve_sudoku_caches_results(monkeypatch):
+    import sudoku_solver
+
+    runs = []
+    run = sudoku_solver._SIM.run
+    monkeypatch.setattr(sudoku_solver._SIM, 'run',
+                        lambda *args, **kwargs: runs.append(args) or run(*args, **kwargs))
+    sudoku_solver._solve_cached.cache_clear()
+
+    first = solve_sudoku([0, 1, 0, 0])
+    second = solve_sudoku([0, 1, 0, 0])
+
+    assert len(runs) == 1
+    assert first == second
+
+
+def test_solve_sudoku_returns_a_copy():
+    first = solve_sudoku([0, 1, 1, 0])
+    expected = dict(first)
+    first.clear()
+    first['0000'] = -1.0
+
+    assert solve_sudoku([0, 1, 1, 0]) == expected